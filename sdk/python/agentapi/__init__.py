@@ -0,0 +1,29 @@
+"""Python client for the agentapi HTTP server."""
+
+from agentapi.api import (
+    DEFAULT_BASE_URL,
+    AgentAPI,
+    AgentAPIAsync,
+    Conversation,
+    Message,
+    MessageResponse,
+    MessageType,
+    Status,
+    UploadResult,
+    gather,
+    use_uvloop,
+)
+
+__all__ = [
+    "DEFAULT_BASE_URL",
+    "AgentAPI",
+    "AgentAPIAsync",
+    "Conversation",
+    "Message",
+    "MessageResponse",
+    "MessageType",
+    "Status",
+    "UploadResult",
+    "gather",
+    "use_uvloop",
+]
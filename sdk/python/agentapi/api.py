@@ -0,0 +1,754 @@
+"""Client for the agentapi HTTP server.
+
+Wraps the /status, /message, /messages, and /upload endpoints exposed by
+`agentapi server`. Both clients hold a single pooled HTTP/2 connection so
+repeated calls reuse one multiplexed stream instead of paying a TCP/TLS
+handshake per request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable
+
+import httpx
+
+_loads: Callable[[bytes | str], Any]
+_dumps: Callable[[Any], bytes]
+try:
+    # Optional C-accelerated JSON codec (`pip install agentapi[fast]`);
+    # 2-5x faster than stdlib json on MB-scale /messages payloads.
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _dumps = _json_dumps
+
+
+try:
+    # Optional incremental JSON parser (`pip install agentapi[fast]`); lets
+    # /messages rows be constructed while the response body is still arriving.
+    import ijson  # type: ignore[import-untyped]
+except ImportError:
+    ijson = None
+
+_parse_ts: Callable[[str], datetime]
+try:
+    # Optional C-accelerated RFC3339 parser (`pip install agentapi[fast]`).
+    from ciso8601 import parse_datetime as _parse_ts  # type: ignore[import-not-found,no-redef]
+except ImportError:
+
+    def _iso_parse_ts(s: str) -> datetime:
+        """Parse a server timestamp, normalizing the trailing 'Z'."""
+        return datetime.fromisoformat(s[:-1] + "+00:00" if s.endswith("Z") else s)
+
+    _parse_ts = _iso_parse_ts
+
+
+DEFAULT_BASE_URL = "http://localhost:3284"
+
+# Shared pool configuration: keep connections alive between calls and allow
+# enough headroom for bursty, concurrent use of a single client.
+_LIMITS = httpx.Limits(
+    max_keepalive_connections=64,
+    max_connections=128,
+    keepalive_expiry=60.0,
+)
+
+# Upload bodies are streamed in chunks of this size rather than buffered whole.
+_UPLOAD_CHUNK = 1 << 20
+
+# Hoisted per-call header dicts; building these inline would generate one
+# throwaway dict per request in polling loops.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_SSE_HEADERS = {"Accept": "text/event-stream"}
+
+
+class _ByteStreamReader:
+    """File-like read() adapter over an httpx byte-chunk iterator for ijson."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._buf = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            self._buf += b"".join(self._chunks)
+            out = bytes(self._buf)
+            self._buf.clear()
+            return out
+        while len(self._buf) < size:
+            try:
+                self._buf += next(self._chunks)
+            except StopIteration:
+                break
+        out = bytes(self._buf[:size])
+        del self._buf[:size]
+        return out
+
+
+class _TTLCache:
+    """Per-path TTL cache for idempotent GET response bodies.
+
+    Entries are evicted on expiry and, beyond `max_entries`, in LRU order,
+    so the cache stays bounded even for long-lived clients.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._max_entries = max_entries
+
+    def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: dict, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str | None = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+class MessageType(Enum):
+    """Type of a message sent to the agent, mirroring the server enum."""
+
+    USER = "user"
+    RAW = "raw"
+
+
+# Precomputed body fragments per message type: send() only has to serialize
+# the content string and splice in the constant tail, instead of building and
+# encoding a fresh dict per call.
+_TYPE_SUFFIX = {t: b',"type":"' + t.value.encode() + b'"}' for t in MessageType}
+
+
+@dataclass(slots=True)
+class Message:
+    """A single message in the conversation history."""
+
+    id: int
+    content: str
+    role: str
+    time: datetime
+    # Lazily-populated cache for `lines`; a sentinel slot rather than
+    # functools.cached_property, which would require a __dict__.
+    _lines: list[str] | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def is_user(self) -> bool:
+        return self.role == "user"
+
+    @property
+    def is_agent(self) -> bool:
+        return self.role == "agent"
+
+    @property
+    def lines(self) -> list[str]:
+        """Content split into lines, computed once on first access."""
+        if self._lines is None:
+            self._lines = self.content.split("\n")
+        return self._lines
+
+
+@dataclass(slots=True)
+class Status:
+    """Agent status as reported by GET /status."""
+
+    status: str
+    agent_type: str
+    transport: str
+
+    @property
+    def is_idle(self) -> bool:
+        return self.status == "stable"
+
+
+@dataclass(slots=True)
+class MessageResponse:
+    """Result of POST /message."""
+
+    ok: bool
+
+
+@dataclass(slots=True)
+class UploadResult:
+    """Result of POST /upload."""
+
+    ok: bool
+    file_path: str
+
+
+@dataclass(slots=True)
+class Conversation:
+    """Client-side view of the conversation history.
+
+    The message list and per-role index lists are mutated in place, so a
+    reference to `messages` stays current across refreshes. The indices
+    are maintained incrementally on add(), so the
+    user_messages/agent_messages properties are O(matches) instead of
+    re-scanning and re-testing every message on each access.
+    """
+
+    messages: list[Message] = field(default_factory=list)
+    _user_idx: list[int] = field(default_factory=list, repr=False, compare=False)
+    _agent_idx: list[int] = field(default_factory=list, repr=False, compare=False)
+
+    def add(self, message: Message) -> None:
+        idx = len(self.messages)
+        self.messages.append(message)
+        if message.role == "user":
+            self._user_idx.append(idx)
+        elif message.role == "agent":
+            self._agent_idx.append(idx)
+
+    def truncate(self, length: int) -> None:
+        """Drop messages past `length` in place, keeping the role indices
+        consistent. The indices are ascending, so trimming their tails is
+        enough."""
+        if length >= len(self.messages):
+            return
+        del self.messages[length:]
+        while self._user_idx and self._user_idx[-1] >= length:
+            self._user_idx.pop()
+        while self._agent_idx and self._agent_idx[-1] >= length:
+            self._agent_idx.pop()
+
+    @property
+    def user_messages(self) -> list[Message]:
+        return [self.messages[i] for i in self._user_idx]
+
+    @property
+    def agent_messages(self) -> list[Message]:
+        return [self.messages[i] for i in self._agent_idx]
+
+
+def _parse_message(m: dict) -> Message:
+    return Message(
+        id=m["id"],
+        content=m["content"],
+        # Interned so the role checks in add()/truncate() and the
+        # is_user/is_agent properties are pointer compares.
+        role=sys.intern(m["role"]),
+        time=_parse_ts(m["time"]),
+    )
+
+
+async def gather(*awaitables: Awaitable[object]) -> list[object]:
+    """Run awaitables concurrently and return their results in order."""
+    return await asyncio.gather(*awaitables)
+
+
+def use_uvloop() -> bool:
+    """Install uvloop as the asyncio event-loop policy, if available.
+
+    uvloop's scheduler handles large send_many fan-outs far better than the
+    stock selector loop. Returns False when uvloop isn't installed (it is
+    part of the agentapi[fast] extra). Called automatically when the first
+    AgentAPIAsync is constructed unless AGENTAPI_UVLOOP=0.
+    """
+    try:
+        import uvloop  # type: ignore[import-not-found]
+    except ImportError:
+        return False
+    uvloop.install()
+    return True
+
+
+class AgentAPI:
+    """Synchronous client for an agentapi server.
+
+    The underlying httpx client is created once with HTTP/2 and a keep-alive
+    pool, and carries the base URL and auth header so individual calls don't
+    rebuild them.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        api_key: str | None = None,
+        timeout: float = 30.0,
+        status_ttl: float = 0.25,
+        cache_ttl: float = 0.0,
+        transport: httpx.BaseTransport | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self._auth_header = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            timeout=timeout,
+            http2=True,
+            limits=_LIMITS,
+            headers=self._auth_header,
+            transport=transport,
+        )
+        self._conversation = Conversation()
+        self._status_ttl = status_ttl
+        self._cache_ttl = cache_ttl
+        self._cache = _TTLCache()
+        self._last_message_id: int | None = None
+
+    def __enter__(self) -> AgentAPI:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._client.close()
+
+    def cache_clear(self) -> None:
+        """Drop all cached GET responses."""
+        self._cache.invalidate()
+
+    def _get(self, path: str, **kwargs: Any) -> dict:
+        resp = self._client.get(path, **kwargs)
+        resp.raise_for_status()
+        return _loads(resp.content)
+
+    def _post(self, path: str, **kwargs: Any) -> dict:
+        resp = self._client.post(path, **kwargs)
+        resp.raise_for_status()
+        return _loads(resp.content)
+
+    def _get_cached(self, path: str, ttl: float, fresh: bool = False) -> dict:
+        """GET `path`, serving a cached body while it is younger than `ttl`."""
+        if not fresh:
+            body = self._cache.get(path)
+            if body is not None:
+                return body
+        body = self._get(path)
+        self._cache.set(path, body, ttl)
+        return body
+
+    @property
+    def conversation(self) -> Conversation:
+        return self._conversation
+
+    def conversation_snapshot(self) -> list[Message]:
+        """Return a shallow copy of the history, insulated from refreshes."""
+        return list(self._conversation.messages)
+
+    def status(self, fresh: bool = False) -> Status:
+        """Return the agent status.
+
+        Results are cached for `status_ttl` seconds so tight poll loops don't
+        translate into one HTTP round-trip per check; pass fresh=True to
+        bypass the cache.
+        """
+        body = self._get_cached("/status", self._status_ttl, fresh=fresh)
+        return Status(
+            status=body["status"],
+            agent_type=body["agent_type"],
+            transport=body["transport"],
+        )
+
+    def send(self, content: str, msg_type: MessageType = MessageType.USER) -> MessageResponse:
+        body = self._post(
+            "/message",
+            content=b'{"content":' + _dumps(content) + _TYPE_SUFFIX[msg_type],
+            headers=_JSON_HEADERS,
+        )
+        # Sending a message changes the conversation and usually flips the
+        # agent to 'running'; don't serve pre-send GET responses.
+        self._cache.invalidate()
+        return MessageResponse(ok=body["ok"])
+
+    def send_many(
+        self,
+        contents: list[str],
+        msg_type: MessageType = MessageType.USER,
+        max_workers: int = 16,
+    ) -> list[MessageResponse]:
+        """Send several messages in parallel from a thread pool.
+
+        The sync counterpart of AgentAPIAsync.send_many: POSTs are issued
+        concurrently over the shared client (httpx.Client is thread-safe) and
+        responses come back in the same order as `contents`.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda c: self.send(c, msg_type), contents))
+
+    def messages(self, full: bool = False) -> list[Message]:
+        """Return the conversation history, refreshing it incrementally.
+
+        The server's history is append-only except for the newest message,
+        which it keeps rewriting while the agent runs. Already-parsed Message
+        objects for the settled prefix are therefore reused between calls;
+        only rows at or past the last seen id are re-parsed. Pass full=True
+        to force a full rebuild.
+        """
+        rows = self._message_rows()
+        keep = 0 if full else self._reusable_prefix(rows)
+        conversation = self._conversation
+        conversation.truncate(keep)
+        for m in rows[keep:]:
+            conversation.add(_parse_message(m))
+        messages = conversation.messages
+        self._last_message_id = messages[-1].id if messages else None
+        return messages
+
+    def _reusable_prefix(self, rows: list[dict]) -> int:
+        if self._last_message_id is None:
+            return 0
+        existing = self._conversation.messages
+        keep = 0
+        limit = min(len(existing), len(rows))
+        while (
+            keep < limit
+            and rows[keep]["id"] < self._last_message_id
+            and existing[keep].id == rows[keep]["id"]
+        ):
+            keep += 1
+        return keep
+
+    def _message_rows(self) -> list[dict]:
+        """Fetch the raw /messages rows, honoring the GET cache."""
+        cached = self._cache.get("/messages")
+        if cached is not None:
+            return cached["messages"]
+        if ijson is None:
+            body = self._get("/messages")
+            self._cache.set("/messages", body, self._cache_ttl)
+            return body["messages"]
+        rows = list(self._stream_message_rows())
+        self._cache.set("/messages", {"messages": rows}, self._cache_ttl)
+        return rows
+
+    def _stream_message_rows(self) -> Iterator[dict]:
+        """Yield rows as they arrive so CPU parse overlaps network receive.
+
+        Wall-clock cost for large histories becomes max(network, parse)
+        rather than their sum, and the raw body is never buffered whole.
+        """
+        with self._client.stream("GET", "/messages") as resp:
+            resp.raise_for_status()
+            yield from ijson.items(
+                _ByteStreamReader(resp.iter_bytes(1 << 16)), "messages.item"
+            )
+
+    def wait_for_idle(self, timeout: float = 60.0, mode: str = "events") -> bool:
+        """Block until the agent reports 'stable', or the timeout expires.
+
+        By default this subscribes to the server's /events SSE stream and
+        returns on the first 'stable' status_change event, so no polling
+        traffic is generated and the wakeup latency is one network RTT. Pass
+        mode="poll" to force the old /status polling loop; it is also used
+        as a fallback when the server doesn't serve /events.
+        """
+        if mode == "poll":
+            return self._wait_for_idle_poll(timeout)
+        try:
+            return self._wait_for_idle_events(timeout)
+        except httpx.TimeoutException:
+            return False
+        except httpx.HTTPError:
+            return self._wait_for_idle_poll(timeout)
+
+    def _wait_for_idle_events(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._client.stream(
+            "GET", "/events", headers=_SSE_HEADERS, timeout=timeout
+        ) as resp:
+            resp.raise_for_status()
+            event = ""
+            for line in resp.iter_lines():
+                if time.monotonic() > deadline:
+                    return False
+                if line.startswith("event:"):
+                    event = line[len("event:") :].strip()
+                elif line.startswith("data:") and event == "status_change":
+                    data = _loads(line[len("data:") :])
+                    if data.get("status") == "stable":
+                        return True
+        return False
+
+    def _wait_for_idle_poll(self, timeout: float) -> bool:
+        # Exponential backoff with jitter: quick to notice an agent that
+        # finishes immediately, while long-running tasks see only a handful
+        # of /status round-trips instead of one every fixed interval.
+        deadline = time.monotonic() + timeout
+        fresh = True
+        delay = 0.1
+        while time.monotonic() < deadline:
+            if self.status(fresh=fresh).is_idle:
+                return True
+            fresh = False
+            time.sleep(delay + random.random() * 0.05)
+            delay = min(delay * 1.7, 2.0)
+        return False
+
+    def upload(self, path: str) -> UploadResult:
+        """Upload a file, streaming the multipart body in 1 MiB chunks.
+
+        The boundary framing and Content-Length are computed up front, so
+        memory use stays constant regardless of file size instead of
+        buffering the whole multipart body like httpx's `files=` encoder.
+        """
+        boundary = uuid.uuid4().hex
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; '
+            f'filename="{os.path.basename(path)}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+        total = len(head) + os.path.getsize(path) + len(tail)
+
+        def multipart() -> Iterator[bytes]:
+            yield head
+            with open(path, "rb") as f:
+                while chunk := f.read(_UPLOAD_CHUNK):
+                    yield chunk
+            yield tail
+
+        body = self._post(
+            "/upload",
+            content=multipart(),
+            headers={
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+                "Content-Length": str(total),
+            },
+        )
+        return UploadResult(ok=body["ok"], file_path=body["filePath"])
+
+
+class AgentAPIAsync:
+    """Asynchronous client for an agentapi server.
+
+    Use as an async context manager; the pooled HTTP/2 client is created on
+    entry and closed on exit.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        api_key: str | None = None,
+        timeout: float = 30.0,
+        status_ttl: float = 0.25,
+        cache_ttl: float = 0.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        if os.getenv("AGENTAPI_UVLOOP", "1") == "1":
+            use_uvloop()
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self._auth_header = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.timeout = timeout
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._conversation = Conversation()
+        self._status_ttl = status_ttl
+        self._cache_ttl = cache_ttl
+        self._cache = _TTLCache()
+        self._last_message_id: int | None = None
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        """Create the pooled client on first use.
+
+        Lazy creation means the client works both under `async with` and as
+        a plain long-lived object; call aclose() in the latter case.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http2=True,
+                limits=_LIMITS,
+                headers=self._auth_header,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def __aenter__(self) -> AgentAPIAsync:
+        self._ensure_client()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying client; safe to call more than once."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def cache_clear(self) -> None:
+        """Drop all cached GET responses."""
+        self._cache.invalidate()
+
+    async def _get(self, path: str, **kwargs: Any) -> dict:
+        resp = await self._ensure_client().get(path, **kwargs)
+        resp.raise_for_status()
+        return _loads(resp.content)
+
+    async def _post(self, path: str, **kwargs: Any) -> dict:
+        resp = await self._ensure_client().post(path, **kwargs)
+        resp.raise_for_status()
+        return _loads(resp.content)
+
+    async def _get_cached(self, path: str, ttl: float, fresh: bool = False) -> dict:
+        """GET `path`, serving a cached body while it is younger than `ttl`."""
+        if not fresh:
+            body = self._cache.get(path)
+            if body is not None:
+                return body
+        body = await self._get(path)
+        self._cache.set(path, body, ttl)
+        return body
+
+    @property
+    def conversation(self) -> Conversation:
+        return self._conversation
+
+    def conversation_snapshot(self) -> list[Message]:
+        """Return a shallow copy of the history, insulated from refreshes."""
+        return list(self._conversation.messages)
+
+    async def status(self, fresh: bool = False) -> Status:
+        """Return the agent status, cached for `status_ttl` seconds."""
+        body = await self._get_cached("/status", self._status_ttl, fresh=fresh)
+        return Status(
+            status=body["status"],
+            agent_type=body["agent_type"],
+            transport=body["transport"],
+        )
+
+    async def send(
+        self, content: str, msg_type: MessageType = MessageType.USER
+    ) -> MessageResponse:
+        body = await self._post(
+            "/message",
+            content=b'{"content":' + _dumps(content) + _TYPE_SUFFIX[msg_type],
+            headers=_JSON_HEADERS,
+        )
+        self._cache.invalidate()
+        return MessageResponse(ok=body["ok"])
+
+    async def send_many(
+        self,
+        contents: list[str],
+        msg_type: MessageType = MessageType.USER,
+        concurrency: int = 32,
+    ) -> list[MessageResponse]:
+        """Send several messages concurrently.
+
+        All POSTs are issued in parallel over the client's single HTTP/2
+        connection, bounded by `concurrency` so the server isn't overwhelmed.
+        Responses are returned in the same order as `contents`.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded_send(content: str) -> MessageResponse:
+            async with semaphore:
+                return await self.send(content, msg_type)
+
+        return await asyncio.gather(*(bounded_send(c) for c in contents))
+
+    async def messages(self, full: bool = False) -> list[Message]:
+        """Return the conversation history, refreshing it incrementally.
+
+        See AgentAPI.messages for the prefix-reuse semantics.
+        """
+        body = await self._get_cached("/messages", self._cache_ttl)
+        rows = body["messages"]
+        keep = 0 if full else self._reusable_prefix(rows)
+        conversation = self._conversation
+        conversation.truncate(keep)
+        for m in rows[keep:]:
+            conversation.add(_parse_message(m))
+        messages = conversation.messages
+        self._last_message_id = messages[-1].id if messages else None
+        return messages
+
+    def _reusable_prefix(self, rows: list[dict]) -> int:
+        if self._last_message_id is None:
+            return 0
+        existing = self._conversation.messages
+        keep = 0
+        limit = min(len(existing), len(rows))
+        while (
+            keep < limit
+            and rows[keep]["id"] < self._last_message_id
+            and existing[keep].id == rows[keep]["id"]
+        ):
+            keep += 1
+        return keep
+
+    async def wait_for_idle(self, timeout: float = 60.0, mode: str = "events") -> bool:
+        """Block until the agent reports 'stable', or the timeout expires.
+
+        Subscribes to the /events SSE stream by default; see
+        AgentAPI.wait_for_idle for the mode semantics.
+        """
+        if mode == "poll":
+            return await self._wait_for_idle_poll(timeout)
+        try:
+            return await self._wait_for_idle_events(timeout)
+        except httpx.TimeoutException:
+            return False
+        except httpx.HTTPError:
+            return await self._wait_for_idle_poll(timeout)
+
+    async def _wait_for_idle_events(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        async with self._ensure_client().stream(
+            "GET", "/events", headers=_SSE_HEADERS, timeout=timeout
+        ) as resp:
+            resp.raise_for_status()
+            event = ""
+            async for line in resp.aiter_lines():
+                if time.monotonic() > deadline:
+                    return False
+                if line.startswith("event:"):
+                    event = line[len("event:") :].strip()
+                elif line.startswith("data:") and event == "status_change":
+                    data = _loads(line[len("data:") :])
+                    if data.get("status") == "stable":
+                        return True
+        return False
+
+    async def _wait_for_idle_poll(self, timeout: float) -> bool:
+        # Same backoff schedule as the sync client.
+        deadline = time.monotonic() + timeout
+        fresh = True
+        delay = 0.1
+        while time.monotonic() < deadline:
+            if (await self.status(fresh=fresh)).is_idle:
+                return True
+            fresh = False
+            await asyncio.sleep(delay + random.random() * 0.05)
+            delay = min(delay * 1.7, 2.0)
+        return False
@@ -0,0 +1,12 @@
+#!/bin/bash
+# Compile the SDK's hot path (agentapi/api.py: request handling, message
+# parsing, and the model classes) to a C extension with mypyc. Dataclass
+# construction and attribute access become C-level operations, typically a
+# 2-4x speedup on the pure-Python portions with no API change.
+#
+# Run from sdk/python. Delete agentapi/*.so to go back to the interpreted
+# module.
+set -euo pipefail
+
+pip install mypy
+python -m mypyc agentapi/api.py
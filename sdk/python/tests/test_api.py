@@ -0,0 +1,247 @@
+"""Tests for the sync and async agentapi clients against a mock transport."""
+
+import json
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from agentapi import AgentAPI, AgentAPIAsync, MessageType
+
+
+def make_handler(state):
+    """Build a mock transport handler emulating the agentapi server."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"].append(request)
+        path = request.url.path
+        if request.method == "GET" and path == "/status":
+            return httpx.Response(
+                200,
+                json={
+                    "status": state["status"],
+                    "agent_type": "claude",
+                    "transport": "pty",
+                },
+            )
+        if request.method == "GET" and path == "/messages":
+            return httpx.Response(200, json={"messages": state["messages"]})
+        if request.method == "GET" and path == "/events":
+            if not state["events"]:
+                return httpx.Response(404, json={"title": "Not Found"})
+            body = "".join(
+                f"event: {name}\ndata: {json.dumps(data)}\n\n"
+                for name, data in state["events"]
+            )
+            return httpx.Response(
+                200, content=body, headers={"Content-Type": "text/event-stream"}
+            )
+        if request.method == "POST" and path == "/upload":
+            state["uploaded"] = request.read()
+            return httpx.Response(200, json={"ok": True, "filePath": "/tmp/upload.bin"})
+        if request.method == "POST" and path == "/message":
+            body = json.loads(request.content)
+            state["sent"].append(body)
+            return httpx.Response(200, json={"ok": True})
+        return httpx.Response(404, json={"title": "Not Found"})
+
+    return handler
+
+
+@pytest.fixture
+def state():
+    return {
+        "status": "stable",
+        "messages": [
+            {
+                "id": 0,
+                "content": "Hello, agent!",
+                "role": "user",
+                "time": "2025-01-01T00:00:00Z",
+            },
+            {
+                "id": 1,
+                "content": "Hello!\nHow can I help?",
+                "role": "agent",
+                "time": "2025-01-01T00:00:01Z",
+            },
+        ],
+        "sent": [],
+        "requests": [],
+        "events": [],
+    }
+
+
+@pytest.fixture
+def api(state):
+    transport = httpx.MockTransport(make_handler(state))
+    with AgentAPI("http://testserver", transport=transport) as api:
+        yield api
+
+
+def test_status(api):
+    status = api.status()
+    assert status.status == "stable"
+    assert status.agent_type == "claude"
+    assert status.transport == "pty"
+    assert status.is_idle
+
+
+def test_send(api, state):
+    resp = api.send("do the thing")
+    assert resp.ok
+    assert state["sent"] == [{"content": "do the thing", "type": "user"}]
+
+    api.send("\x1b", msg_type=MessageType.RAW)
+    assert state["sent"][-1]["type"] == "raw"
+
+
+def test_messages(api):
+    messages = api.messages()
+    assert [m.id for m in messages] == [0, 1]
+    assert messages[0].is_user
+    assert messages[1].is_agent
+    assert messages[1].lines == ["Hello!", "How can I help?"]
+    assert messages[1].lines is messages[1].lines  # split once, then cached
+    assert messages[0].time == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert api.conversation.messages == messages
+    assert api.conversation.user_messages == [messages[0]]
+    assert api.conversation.agent_messages == [messages[1]]
+
+
+def test_status_cache(state):
+    transport = httpx.MockTransport(make_handler(state))
+    with AgentAPI("http://testserver", status_ttl=60.0, transport=transport) as api:
+        assert api.status().is_idle
+        assert api.status().is_idle
+        assert len(state["requests"]) == 1
+
+        assert api.status(fresh=True).is_idle
+        assert len(state["requests"]) == 2
+
+        # send() invalidates the cached status
+        api.send("hi")
+        api.status()
+        assert len(state["requests"]) == 4
+
+
+def test_messages_cache(state):
+    transport = httpx.MockTransport(make_handler(state))
+    with AgentAPI("http://testserver", cache_ttl=60.0, transport=transport) as api:
+        api.messages()
+        api.messages()
+        assert len(state["requests"]) == 1
+
+        # Writes invalidate cached GETs.
+        api.send("hi")
+        api.messages()
+        assert len(state["requests"]) == 3
+
+
+def test_wait_for_idle_events(api, state):
+    state["events"] = [
+        ("message_update", {"id": 0, "role": "agent", "message": "hi"}),
+        ("status_change", {"status": "running", "agent_type": "claude"}),
+        ("status_change", {"status": "stable", "agent_type": "claude"}),
+    ]
+    assert api.wait_for_idle(timeout=5.0)
+    assert state["requests"][-1].url.path == "/events"
+
+
+def test_wait_for_idle_falls_back_to_polling(api, state):
+    # No /events support: the handler 404s and the client polls /status.
+    assert api.wait_for_idle(timeout=5.0)
+    assert state["requests"][-1].url.path == "/status"
+
+
+async def test_wait_for_idle_events_async(state):
+    state["events"] = [("status_change", {"status": "stable", "agent_type": "claude"})]
+    transport = httpx.MockTransport(make_handler(state))
+    async with AgentAPIAsync("http://testserver", transport=transport) as api:
+        assert await api.wait_for_idle(timeout=5.0)
+
+
+def test_messages_incremental_refresh(api, state):
+    first = api.messages()
+    snapshot = api.conversation_snapshot()
+
+    # The server rewrites the newest message while the agent runs and
+    # appends new ones; older messages are settled.
+    state["messages"][1]["content"] = "Hello!\nHow can I help?\nDone."
+    state["messages"].append(
+        {"id": 2, "content": "thanks", "role": "user", "time": "2025-01-01T00:00:02Z"}
+    )
+    second = api.messages()
+
+    assert second is first  # the live list is mutated in place
+    assert [m.id for m in second] == [0, 1, 2]
+    assert second[0] is snapshot[0]  # settled prefix is reused, not re-parsed
+    assert second[1].content.endswith("Done.")
+    assert api.conversation.user_messages == [second[0], second[2]]
+
+    # The snapshot is insulated from the refresh.
+    assert len(snapshot) == 2
+    assert not snapshot[1].content.endswith("Done.")
+
+    # full=True forces a rebuild of every row.
+    rebuilt = api.messages(full=True)
+    assert rebuilt[0] is not snapshot[0]
+
+
+def test_send_many_sync(api, state):
+    responses = api.send_many(["one", "two", "three"], max_workers=2)
+    assert all(r.ok for r in responses)
+    assert sorted(b["content"] for b in state["sent"]) == ["one", "three", "two"]
+
+
+def test_upload_streams_multipart(api, state, tmp_path):
+    payload = b"x" * (3 * 1024 * 1024)
+    f = tmp_path / "upload.bin"
+    f.write_bytes(payload)
+
+    result = api.upload(str(f))
+    assert result.ok
+    assert result.file_path == "/tmp/upload.bin"
+
+    request = state["requests"][-1]
+    content_type = request.headers["Content-Type"]
+    assert content_type.startswith("multipart/form-data; boundary=")
+    assert int(request.headers["Content-Length"]) == len(state["uploaded"])
+    assert b'name="file"; filename="upload.bin"' in state["uploaded"]
+    assert payload in state["uploaded"]
+
+
+def test_auth_header(state):
+    transport = httpx.MockTransport(make_handler(state))
+    with AgentAPI("http://testserver", api_key="secret", transport=transport) as api:
+        api.status()
+    assert state["requests"][0].headers["Authorization"] == "Bearer secret"
+
+
+async def test_async_client(state):
+    transport = httpx.MockTransport(make_handler(state))
+    async with AgentAPIAsync("http://testserver", transport=transport) as api:
+        status = await api.status()
+        assert status.is_idle
+        resp = await api.send("hi")
+        assert resp.ok
+        messages = await api.messages()
+        assert len(messages) == 2
+
+
+async def test_async_client_without_context_manager(state):
+    transport = httpx.MockTransport(make_handler(state))
+    api = AgentAPIAsync("http://testserver", transport=transport)
+    try:
+        assert (await api.status()).is_idle
+    finally:
+        await api.aclose()
+        await api.aclose()  # idempotent
+
+
+async def test_send_many(state):
+    transport = httpx.MockTransport(make_handler(state))
+    async with AgentAPIAsync("http://testserver", transport=transport) as api:
+        responses = await api.send_many(["one", "two", "three"], concurrency=2)
+    assert all(r.ok for r in responses)
+    assert sorted(b["content"] for b in state["sent"]) == ["one", "three", "two"]